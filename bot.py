@@ -1,11 +1,13 @@
 from __future__ import annotations
-from dateutil import parser
 import numpy as np
 import matplotlib.pyplot as plt
 import os
 import io
 import asyncio
+import itertools
 import re
+import threading
+import time
 from datetime import datetime, timezone
 
 import discord
@@ -16,7 +18,7 @@ from storage import Storage
 from models import User, Play, TopStats
 from osu_api import OsuApi
 from osu_http import OsuHttpClient
-from compute import compute_TS, compute_push_value, PushInputs
+from compute import compute_TS, compute_push_value_batch
 from scheduler import build_scheduler, add_cron_jobs
 from utils import current_month_str_utc, utcnow_naive
 
@@ -25,6 +27,35 @@ import matplotlib
 
 matplotlib.use("Agg")
 
+# One shared figure for the stars histogram: figure creation is the
+# expensive part of matplotlib, redrawing into the same axes is cheap.
+# Rendering runs on a worker thread, so a threading.Lock guards the
+# non-reentrant figure state.
+_HIST_BINS = np.arange(0.0, 10.0 + 0.25, 0.25)
+# Discord scales inline images down anyway; 600x350 keeps the PNG encode cheap
+_HIST_FIG, _HIST_AX = plt.subplots(figsize=(6, 3.5), dpi=100)
+_HIST_LOCK = threading.Lock()
+
+
+def _render_hist(stars: np.ndarray) -> bytes:
+    """Draw the star histogram and return the encoded PNG bytes.
+
+    Synchronous and CPU-bound; call via asyncio.to_thread so savefig
+    does not block the event loop.
+    """
+    buf = io.BytesIO()
+    with _HIST_LOCK:
+        _HIST_AX.cla()
+        counts, _ = np.histogram(stars, bins=_HIST_BINS)
+        _HIST_AX.bar(_HIST_BINS[:-1], counts, width=0.25, align="edge")
+        _HIST_AX.set_title("Star-Rating-Distribution (this month)")
+        _HIST_AX.set_xlabel("Stars")
+        _HIST_AX.set_ylabel("Amount Plays")
+        _HIST_AX.set_xlim(0, 10)
+        _HIST_FIG.tight_layout()
+        _HIST_FIG.savefig(buf, format="png")
+    return buf.getvalue()
+
 # TODO: separate this file into two - only discord based functions should be in here
 
 
@@ -42,11 +73,20 @@ if not DISCORD_TOKEN or not OSU_CLIENT_ID or not OSU_CLIENT_SECRET:
 
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="&", intents=intents, help_command=None)
 
 storage = Storage(DATABASE_URL)
-osu_http = OsuHttpClient(OSU_CLIENT_ID, OSU_CLIENT_SECRET)
-osu = OsuApi(osu_http)
+osu_http = OsuHttpClient(OSU_CLIENT_ID, OSU_CLIENT_SECRET, storage=storage)
+osu = OsuApi(osu_http, storage=storage)
+
+
+class PushBot(commands.Bot):
+    async def close(self):
+        # release the pooled osu! connections before the loop goes away
+        await osu_http.aclose()
+        await super().close()
+
+
+bot = PushBot(command_prefix="&", intents=intents, help_command=None)
 
 
 # =========================
@@ -75,18 +115,22 @@ def _mods_have_nf(mods) -> bool:
     """
     if not mods:
         return False
-    if isinstance(mods, list) and mods and isinstance(mods[0], dict):
-        acr = [str(m.get("acronym", "")).upper() for m in mods]
-    else:
-        acr = [str(m).upper() for m in mods]
-    return "NF" in acr
+    if isinstance(mods[0], dict):
+        return any(str(m.get("acronym", "")).upper() == "NF" for m in mods)
+    return any(str(m).upper() == "NF" for m in mods)
 
 
 async def resolve_user(ctx: commands.Context, username_opt: str | None) -> User | None:
     if username_opt:
-        user = storage.get_user_by_osu_username(username_opt)
+        user = await asyncio.to_thread(storage.get_user_by_osu_username, username_opt)
         if user:
             return user
+        # numeric argument: maybe an osu user id we already know locally,
+        # which saves the API round trip entirely
+        if username_opt.isdigit():
+            user = await asyncio.to_thread(storage.get_user_by_osu_id, username_opt)
+            if user:
+                return user
         data = await osu.get_user(username_opt)
         if not data:
             await ctx.reply("User not found")
@@ -97,17 +141,19 @@ async def resolve_user(ctx: commands.Context, username_opt: str | None) -> User
             )
             return None
     else:
-        user = storage.get_user_by_discord(str(ctx.author.id))
+        user = await asyncio.to_thread(storage.get_user_by_discord, ctx.author.id)
         if not user:
             await ctx.reply("Please use `&register [osu-username|osu-user-id]` first.")
         return user
 
 
 def _parse_osu_score_time(s: dict) -> datetime | None:
+    # datetime.fromisoformat is C-implemented and much faster than
+    # dateutil's pure-Python parser; osu! timestamps are plain ISO8601.
     for key in ("ended_at", "created_at"):
         val = s.get(key)
         if val:
-            dt = parser.isoparse(val)
+            dt = datetime.fromisoformat(val.replace("Z", "+00:00"))
             if dt.tzinfo:
                 dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
             else:
@@ -116,15 +162,64 @@ def _parse_osu_score_time(s: dict) -> datetime | None:
     return None
 
 
+# Short-TTL memo for cumulative push sums, keyed by (user_id, scope_hours).
+# Invalidated as soon as a sync actually inserts a new play for the user.
+_PUSH_CACHE: dict[tuple[int, int | None], tuple[float, float]] = {}
+_PUSH_CACHE_TTL = 60.0
+
+
+def cumulative_push_cached(user_id: int, scope_hours: int | None = None) -> float:
+    key = (user_id, scope_hours)
+    hit = _PUSH_CACHE.get(key)
+    now = time.time()
+    if hit and hit[1] > now:
+        return hit[0]
+    val = storage.cumulative_push(user_id, scope_hours=scope_hours)
+    _PUSH_CACHE[key] = (val, now + _PUSH_CACHE_TTL)
+    return val
+
+
+# Same idea for the leaderboard aggregate: the GROUP BY result only
+# changes when new plays land, so reuse it between invocations.
+_LEADERBOARD_CACHE: dict[int | None, tuple[dict[int, float], float]] = {}
+
+
+def cumulative_push_all_cached(scope_hours: int | None = None) -> dict[int, float]:
+    hit = _LEADERBOARD_CACHE.get(scope_hours)
+    now = time.time()
+    if hit and hit[1] > now:
+        return hit[0]
+    sums = storage.cumulative_push_all(scope_hours=scope_hours)
+    _LEADERBOARD_CACHE[scope_hours] = (sums, now + _PUSH_CACHE_TTL)
+    return sums
+
+
+def _invalidate_push_cache(user_id: int):
+    for key in [k for k in _PUSH_CACHE if k[0] == user_id]:
+        del _PUSH_CACHE[key]
+    _LEADERBOARD_CACHE.clear()
+
+
+# TopStats are immutable within a month, so cache them per (user, month)
+# and skip the storage round trip on every sync.
+_TOPSTATS_CACHE: dict[tuple[int, str], TopStats] = {}
+
+
 async def fetch_topstats_for_month(user: User, month_str: str) -> TopStats:
-    existing = storage.get_topstats(user.id, month_str)
+    cached = _TOPSTATS_CACHE.get((user.id, month_str))
+    if cached:
+        return cached
+
+    existing = await asyncio.to_thread(storage.get_topstats, user.id, month_str)
     if existing:
+        _TOPSTATS_CACHE[(user.id, month_str)] = existing
         return existing
 
     # All osu tops for Top_Star
     best = await osu.get_user_best(user.osu_user_id, limit=50, mode="osu")
     pp_threshold = best["pp_threshold"]
-    if not best:
+    # vorher stand hier "if not best:", was nie griff (dict ist nie leer)
+    if not best["top10"]:
         ts = TopStats(
             user_id=user.id,
             month=month_str,
@@ -133,24 +228,33 @@ async def fetch_topstats_for_month(user: User, month_str: str) -> TopStats:
             top_star_TS=0.0,
             top50_pp_threshold=0.0,
         )
-        storage.upsert_topstats(ts)
+        await asyncio.to_thread(storage.upsert_topstats, ts)
+        _TOPSTATS_CACHE[(user.id, month_str)] = ts
         return ts
 
-    # filter NF
-    best = [s for s in best["top10"] if not _mods_have_nf(s.get("mods"))]
-
-    # sort by pp
-    sorted_best = sorted(best, key=lambda s: float(s.get("pp") or 0.0), reverse=True)
-    # Top10 for TS
-    top10 = sorted_best[:10]
-    sr_vals = []
-    miss_sum = 0
-    for s in top10:
-        sr = s.get("beatmap", {}).get("difficulty_rating")
-        sr_vals.append(float(sr or 0.0))
-        miss_sum += int((s.get("statistics") or {}).get("miss", 0))
-
-    top10_avg_star_raw = float(np.mean(sr_vals)) if sr_vals else 0.0
+    # One extraction pass into a structured array; NF filter, pp sort and
+    # the top10 aggregates then all run in C instead of Python loops.
+    plays = best["top10"]
+    dtype = np.dtype([("pp", "f8"), ("sr", "f8"), ("miss", "i4"), ("nf", "?")])
+    arr = np.fromiter(
+        (
+            (
+                float(s.get("pp") or 0.0),
+                float((s.get("beatmap") or {}).get("difficulty_rating") or 0.0),
+                int((s.get("statistics") or {}).get("miss", 0)),
+                _mods_have_nf(s.get("mods")),
+            )
+            for s in plays
+        ),
+        dtype=dtype,
+        count=len(plays),
+    )
+    arr = arr[~arr["nf"]]
+    arr.sort(order="pp")
+    top10 = arr[-10:]
+
+    miss_sum = int(top10["miss"].sum()) if top10.size else 0
+    top10_avg_star_raw = float(top10["sr"].mean()) if top10.size else 0.0
     TS = compute_TS(top10_avg_star_raw, miss_sum)
 
     ts = TopStats(
@@ -161,25 +265,32 @@ async def fetch_topstats_for_month(user: User, month_str: str) -> TopStats:
         top_star_TS=TS,
         top50_pp_threshold=pp_threshold,
     )
-    storage.upsert_topstats(ts)
+    await asyncio.to_thread(storage.upsert_topstats, ts)
+    _TOPSTATS_CACHE[(user.id, month_str)] = ts
     return ts
 
 
-async def sync_recent_for_user(user: User):
+async def collect_new_plays_for_user(user: User) -> list[Play]:
+    """Fetch + filter + score the user's recent plays without touching the DB.
+
+    Returns the Play rows that still need inserting, so callers can either
+    write them directly (commands) or hand them to a writer task (cron).
+    """
     recent_plays = await osu.get_user_recent(user.osu_user_id, limit=50, mode="osu")
 
     if not recent_plays:
-        return
-
-    month_str = current_month_str_utc()
-    ts = await fetch_topstats_for_month(user, month_str)
+        return []
 
+    # One pass to filter and extract scalars, then one vectorized
+    # compute_push_value_batch call instead of 50 scalar evaluations.
+    rows = []
     for plays in recent_plays:
         # 1) Only passed runs
         if plays.get("passed") is False:
             continue
         # 2) Ignore all NF mixes
-        if _mods_have_nf(plays.get("mods")):
+        mods = plays.get("mods") or []
+        if _mods_have_nf(mods):
             continue
 
         ts_utc = _parse_osu_score_time(plays)
@@ -187,36 +298,53 @@ async def sync_recent_for_user(user: User):
             continue
 
         beatmap = plays.get("beatmap") or {}
-        beatmap_id = str(beatmap.get("id") or "")
+        beatmap_id = int(beatmap.get("id") or 0)
         if not beatmap_id:
             continue
 
+        stats = plays.get("statistics") or {}
         sr = float(beatmap.get("difficulty_rating") or 0.0)
         total_len = float(beatmap.get("total_length") or 0.0)
         acc = float(plays.get("accuracy") or 0.0) * 100.0
-        misses = int((plays.get("statistics") or {}).get("miss", 0))
+        misses = int(stats.get("miss", 0))
         pp = float(plays.get("pp") or 0.0)
         toc = float(
             (beatmap.get("count_circles") + beatmap.get("count_sliders")) or 0.0
         )
+        DT_rate = get_dt_rate(mods)
 
-        DT_rate = get_dt_rate(plays.get("mods", []))
-
-        pv = compute_push_value(
-            PushInputs(
-                pp=pp,
-                SR=sr,
-                TS=ts.top_star_TS,
-                accuracy_percent=acc,
-                map_length_seconds=total_len,
-                top50_pp_threshold=ts.top50_pp_threshold,
-                misses=misses,
-                toc=toc,
-                DT_rate=DT_rate,
-            )
-        )
+        rows.append((ts_utc, beatmap_id, sr, total_len, acc, misses, pp, toc, DT_rate))
+
+    # nothing usable in the recent list -> skip the topstats fetch entirely
+    if not rows:
+        return []
 
-        p = Play(
+    # recent windows overlap from run to run, so most scores are already
+    # stored - drop those before doing any further work
+    oldest = min(r[0] for r in rows)
+    known = await asyncio.to_thread(storage.existing_play_keys, user.id, oldest)
+    rows = [r for r in rows if (r[1], r[0]) not in known]
+    if not rows:
+        return []
+
+    month_str = current_month_str_utc()
+    ts = await fetch_topstats_for_month(user, month_str)
+
+    n = len(rows)
+    pv_arr = compute_push_value_batch(
+        pp=np.fromiter((r[6] for r in rows), dtype=np.float64, count=n),
+        SR=np.fromiter((r[2] for r in rows), dtype=np.float64, count=n),
+        TS=ts.top_star_TS,
+        acc=np.fromiter((r[4] for r in rows), dtype=np.float64, count=n),
+        length=np.fromiter((r[3] for r in rows), dtype=np.float64, count=n),
+        Top50=ts.top50_pp_threshold,
+        misses=np.fromiter((r[5] for r in rows), dtype=np.float64, count=n),
+        toc=np.fromiter((r[7] for r in rows), dtype=np.float64, count=n),
+        dt_rate=np.fromiter((r[8] for r in rows), dtype=np.float64, count=n),
+    )
+
+    return [
+        Play(
             user_id=user.id,
             timestamp=ts_utc,
             beatmap_id=beatmap_id,
@@ -229,26 +357,104 @@ async def sync_recent_for_user(user: User):
             source="recent",
             push_value=float(pv),
         )
-        storage.insert_play_if_new(p)
+        for (ts_utc, beatmap_id, sr, total_len, acc, misses, pp, _, _), pv in zip(
+            rows, pv_arr
+        )
+    ]
+
+
+async def sync_recent_for_user(user: User):
+    to_insert = await collect_new_plays_for_user(user)
+    if not to_insert:
+        return
+    # one INSERT ... ON CONFLICT DO NOTHING instead of 50 round trips
+    if await asyncio.to_thread(storage.insert_plays_bulk, to_insert):
+        _invalidate_push_cache(user.id)
+
+
+# Cap concurrent per-user syncs so we don't flood the osu! API
+SYNC_SEMAPHORE = asyncio.Semaphore(8)
+
+# Task-Erzeugung in Häppchen: bei vielen Usern nicht tausende Tasks auf
+# einmal anlegen, sondern batchweise — die Semaphore begrenzt ohnehin die
+# gleichzeitige Arbeit, das hier begrenzt den Speicher.
+SYNC_BATCH_SIZE = 32
+
+
+def _chunked(seq, size: int):
+    it = iter(seq)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+# Re-entrancy guards: if a run takes longer than the cron interval, the
+# next tick must be dropped instead of overlapping with the running one.
+_HALF_HOUR_LOCK = asyncio.Lock()
+_MONTHLY_LOCK = asyncio.Lock()
 
 
 async def half_hour_recent_sync():
-    users = storage.get_all_users()
-    for u in users:
-        try:
-            await sync_recent_for_user(u)
-        except Exception:
-            continue
+    if _HALF_HOUR_LOCK.locked():
+        return
+    async with _HALF_HOUR_LOCK:
+        users = await asyncio.to_thread(storage.get_all_users)
+
+        # Producer/consumer: fetching+scoring overlaps with DB writes, so
+        # total wall time is max(HTTP time, DB time) instead of the sum.
+        queue: asyncio.Queue[tuple[User, list[Play]] | None] = asyncio.Queue(maxsize=64)
+
+        async def _produce(u: User):
+            async with SYNC_SEMAPHORE:
+                try:
+                    plays = await collect_new_plays_for_user(u)
+                except Exception:
+                    return
+            if plays:
+                await queue.put((u, plays))
+
+        async def _write():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                u, plays = item
+                try:
+                    if await asyncio.to_thread(storage.insert_plays_bulk, plays):
+                        _invalidate_push_cache(u.id)
+                except Exception:
+                    # ein kaputter Batch darf nicht den Writer (und damit
+                    # alle restlichen User des Laufs) mitreißen
+                    continue
+
+        writer = asyncio.create_task(_write())
+        # batchweise produzieren: der Writer leert die Queue parallel weiter
+        for batch in _chunked(users, SYNC_BATCH_SIZE):
+            await asyncio.gather(*(_produce(u) for u in batch))
+        await queue.put(None)
+        await writer
 
 
 async def monthly_top_init():
-    users = storage.get_all_users()
+    if _MONTHLY_LOCK.locked():
+        return
+    async with _MONTHLY_LOCK:
+        await _monthly_top_init_locked()
+
+
+async def _monthly_top_init_locked():
+    # month rollover: stale entries from the previous month must not linger
+    _TOPSTATS_CACHE.clear()
+    users = await asyncio.to_thread(storage.get_all_users)
     month_str = current_month_str_utc()
-    for u in users:
-        try:
-            await fetch_topstats_for_month(u, month_str)
-        except Exception:
-            continue
+
+    async def _one(u: User):
+        async with SYNC_SEMAPHORE:
+            try:
+                await fetch_topstats_for_month(u, month_str)
+            except Exception:
+                pass
+
+    for batch in _chunked(users, SYNC_BATCH_SIZE):
+        await asyncio.gather(*(_one(u) for u in batch))
 
 
 # =========================
@@ -284,7 +490,7 @@ async def register(ctx: commands.Context, *args):
         return
 
     # Prüfen, ob User schon registriert ist
-    existing_user = storage.get_user_by_discord(str(ctx.author.id))
+    existing_user = await asyncio.to_thread(storage.get_user_by_discord, ctx.author.id)
 
     if existing_user:  # if a user is already registered, inform
         await ctx.reply(
@@ -297,8 +503,8 @@ async def register(ctx: commands.Context, *args):
         await ctx.reply("❌ Could not find osu!-user.")
         return
 
-    user = storage.upsert_user(
-        str(ctx.author.id), str(osu_data["id"]), osu_data["username"]
+    user = await asyncio.to_thread(
+        storage.upsert_user, ctx.author.id, int(osu_data["id"]), osu_data["username"]
     )
     await ctx.reply(
         f"✅ Registered with osu!-Account **{user.osu_username}** (ID {user.osu_user_id})."
@@ -327,7 +533,7 @@ async def push(ctx: commands.Context, username: str | None = None):
     wait_msg = await ctx.reply(embed=wait_embed)
 
     await sync_recent_for_user(user)
-    total = storage.cumulative_push(user.id, scope_hours=None)
+    total = await asyncio.to_thread(cumulative_push_cached, user.id, None)
     result_embed = discord.Embed(
         title="Push Value",
         description=f"Push Value for **{user.osu_username}**: **{total:.2f}**",
@@ -352,7 +558,7 @@ async def push_session(ctx: commands.Context, username: str | None = None):
     wait_msg = await ctx.reply(embed=wait_embed)
 
     await sync_recent_for_user(user)
-    total = storage.cumulative_push(user.id, scope_hours=12)
+    total = await asyncio.to_thread(cumulative_push_cached, user.id, 12)
 
     result_embed = discord.Embed(
         title="Push Value (last 12 hrs)",
@@ -373,36 +579,33 @@ async def leaderboard(ctx: commands.Context, *args):
             except Exception:
                 pass
 
-    users = storage.get_all_users()
-    entries = []
-    for u in users:
-        val = storage.cumulative_push(u.id, scope_hours=scope_hours)
-        entries.append((u.osu_username, val))
-    entries.sort(key=lambda x: x[1], reverse=True)
+    users = await asyncio.to_thread(storage.get_all_users)
+    # one GROUP BY query instead of one SUM query per user
+    sums = await asyncio.to_thread(cumulative_push_all_cached, scope_hours)
+    ranked = sorted(
+        ((u, sums.get(u.id, 0.0)) for u in users), key=lambda x: x[1], reverse=True
+    )
 
+    my_user = await asyncio.to_thread(storage.get_user_by_discord, ctx.author.id)
+    my_id = my_user.id if my_user else None
+
+    # one pass builds the display lines, the snapshot and my rank
     lines = []
     me_rank = None
-    my_user = storage.get_user_by_discord(str(ctx.author.id))
-    my_name = my_user.osu_username if my_user else None
-
-    for idx, (name, val) in enumerate(entries, start=1):
-        lines.append(f"{idx}. {name}: {val:.2f}")
-        if my_name and name == my_name:
-            me_rank = idx
-
-    # Snapshot speichern
     snap_entries = []
-    for r, (name, val) in enumerate(entries, start=1):
-        u = storage.get_user_by_osu_username(name)
+    for rank, (u, val) in enumerate(ranked, start=1):
+        lines.append(f"{rank}. {u.osu_username}: {val:.2f}")
+        if my_id and u.id == my_id:
+            me_rank = rank
         snap_entries.append(
             {
-                "user_id": u.id if u else None,
-                "osu_username": name,
+                "user_id": u.id,
+                "osu_username": u.osu_username,
                 "cumulative_push_value": val,
-                "rank": r,
+                "rank": rank,
             }
         )
-    storage.snapshot_leaderboard(scope_hours, snap_entries)
+    await asyncio.to_thread(storage.snapshot_leaderboard, scope_hours, snap_entries)
 
     title = (
         "Leaderboard" if scope_hours is None else f"Leaderboard (last {scope_hours}h)"
@@ -422,60 +625,49 @@ async def stars(ctx: commands.Context, username: str | None = None):
     await sync_recent_for_user(user)
 
     now = utcnow_naive()
-    plays = storage.plays_in_month(user.id, now.year, now.month)
-    if not plays:
+    stars = await asyncio.to_thread(storage.star_ratings_in_month, user.id, now.year, now.month)
+    if stars.size == 0:
         await ctx.reply("No plays found this month.")
         return
 
-    stars = [p.star_rating for p in plays]
-    bins = np.arange(0.0, 10.0 + 0.25, 0.25)
-    fig = plt.figure(figsize=(8, 4.5), dpi=140)
-    plt.hist(stars, bins=bins)
-    plt.title("Star-Rating-Distribution (this month)")
-    plt.xlabel("Stars")
-    plt.ylabel("Amount Plays")
-    plt.xlim(0, 10)
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png")
-    plt.close(fig)
-    buf.seek(0)
+    png_bytes = await asyncio.to_thread(_render_hist, stars)
 
-    file = discord.File(fp=buf, filename="stars.png")
+    file = discord.File(fp=io.BytesIO(png_bytes), filename="stars.png")
     await ctx.reply(content=f"Star-Distribution for **{user.osu_username}**", file=file)
 
 
+# Easter-egg triggers, compiled into one alternation so each message is
+# scanned once instead of once per pattern. lastgroup tells us which hit.
+_TRIGGERS = [
+    (
+        "ii",
+        r"\bii\b",
+        "Improvement index is a bad metric. You will not find fun in this game while chasing improvement. You will not make friends sharing your high ii.",
+    ),
+    ("french", r"[Ff]rench", ":french_bread:"),
+    ("kev", r"Kev", "Did I hear cope?"),
+    ("sad", r"sad", ":wilted_rose:"),
+    ("cope", r"cope", "Stop coping and start pushing!"),
+    ("sybau", r"sybau", "Stay young, beautiful and unique :dancer:"),
+    ("goat", r"goat", ":goat:"),
+    ("pain", r"pain", ":adhesive_bandage:"),
+    ("farm", r"farm", "🚨 FARMING IN PUSHTEMBER?? 🚨"),
+    ("paly", r"\bpaly\b", "Paly? I do not think this is correct."),
+]
+_TRIGGER_PATTERN = re.compile("|".join(f"(?P<{n}>{p})" for n, p, _ in _TRIGGERS))
+_TRIGGER_RESPONSES = {n: response for n, _, response in _TRIGGERS}
+
+
 @bot.event
 async def on_message(message):
     # appreciate these easter eggs, but we don't need that many if-statements :')
 
-    if message.author == bot.user:
+    if message.author.bot:
         return
 
-    # dictionary stores all commands in one place
-    triggers = [
-        (
-            r"\bii\b",
-            "Improvement index is a bad metric. You will not find fun in this game while chasing improvement. You will not make friends sharing your high ii.",
-        ),
-        (r"French", ":french_bread:"),
-        (r"french", ":french_bread:"),
-        (r"Kev", "Did I hear cope?"),
-        (r"sad", ":wilted_rose:"),
-        (r"cope", "Stop coping and start pushing!"),
-        (r"sybau", "Stay young, beautiful and unique :dancer:"),
-        (r"goat", ":goat:"),
-        (r"pain", ":adhesive_bandage:"),
-        (r"farm", "🚨 FARMING IN PUSHTEMBER?? 🚨"),
-        (r"\bpaly\b", "Paly? I do not think this is correct."),
-    ]
-
-    # for each pattern and response, check if the message content contains any
-    for pattern, response in triggers:
-        if re.search(pattern, message.content):
-            await message.channel.send(response)
-            break
+    m = _TRIGGER_PATTERN.search(message.content)
+    if m:
+        await message.channel.send(_TRIGGER_RESPONSES[m.lastgroup])
 
     # special case for 727, as it produces an embed
     if re.search(r"727", message.content):
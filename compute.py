@@ -2,6 +2,8 @@ from __future__ import annotations
 from math import sqrt
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class PushInputs:
@@ -34,19 +36,61 @@ def compute_push_value(inputs: PushInputs) -> float:
 
     # can add new calcs here
 
-    # Cases in order of specification
-    if (pp > Top50) and (SR < TS):
-        return max(-20000.0, -20000.0 * (TS - SR))
-    if (pp > Top50) and (SR >= TS):
+    # Cases in order of specification; the pp/Top50 split is decided once
+    # instead of being re-tested in every branch.
+    if pp > Top50:
+        if SR < TS:
+            return max(-20000.0, -20000.0 * (TS - SR))
         return 0.0
-    if (pp <= Top50) and (acc > 95.0):
+    if acc > 95.0:
         return 0.0
-    if (pp <= Top50) and (92.0 <= acc <= 95.0):
-        return (((95 - acc) / 3) * length)*(1+misses/toc)/dt_rate
-    if (pp <= Top50) and (85.0 <= acc < 92.0):
-        return length*(1+misses/toc)/dt_rate
-    if (pp <= Top50) and (71.67 <= acc < 85.0):
-        return ((0.06 * acc - 4.1) * length)*(1+misses/toc)/dt_rate
-    if (pp <= Top50) and (acc < 71.67):
-        return 0.2 * length/dt_rate
+    miss_factor = (1 + misses / toc) / dt_rate
+    if 92.0 <= acc <= 95.0:
+        return ((95 - acc) / 3) * length * miss_factor
+    if 85.0 <= acc < 92.0:
+        return length * miss_factor
+    if 71.67 <= acc < 85.0:
+        return (0.06 * acc - 4.1) * length * miss_factor
+    if acc < 71.67:
+        return 0.2 * length / dt_rate
     return 0.0
+
+
+def compute_push_value_batch(
+    pp: np.ndarray,
+    SR: np.ndarray,
+    TS: float,
+    acc: np.ndarray,
+    length: np.ndarray,
+    Top50: float,
+    misses: np.ndarray,
+    toc: np.ndarray,
+    dt_rate: np.ndarray,
+) -> np.ndarray:
+    """Vectorized compute_push_value for a whole batch of scores.
+
+    Same cases in the same order as the scalar version; np.select picks
+    the first matching condition element-wise.
+    """
+    miss_factor = (1.0 + misses / toc) / dt_rate
+
+    over = pp > Top50
+    conditions = [
+        over & (SR < TS),
+        over,
+        acc > 95.0,
+        (92.0 <= acc) & (acc <= 95.0),
+        (85.0 <= acc) & (acc < 92.0),
+        (71.67 <= acc) & (acc < 85.0),
+        acc < 71.67,
+    ]
+    choices = [
+        np.maximum(-20000.0, -20000.0 * (TS - SR)),
+        np.zeros_like(length),
+        np.zeros_like(length),
+        ((95.0 - acc) / 3.0) * length * miss_factor,
+        length * miss_factor,
+        (0.06 * acc - 4.1) * length * miss_factor,
+        0.2 * length / dt_rate,
+    ]
+    return np.select(conditions, choices, default=0.0)
@@ -1,8 +1,7 @@
 from __future__ import annotations
-import uuid
 from datetime import datetime
 from sqlalchemy import (
-    String, Integer, Float, Boolean, DateTime, ForeignKey, UniqueConstraint, Index, JSON
+    String, Integer, BigInteger, Float, Boolean, DateTime, ForeignKey, UniqueConstraint, Index, JSON
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.dialects.sqlite import JSON as SQLITE_JSON
@@ -10,14 +9,13 @@ from sqlalchemy.dialects.sqlite import JSON as SQLITE_JSON
 class Base(DeclarativeBase):
     pass
 
-def _uuid() -> str:
-    return str(uuid.uuid4())
-
 class User(Base):
     __tablename__ = "users"
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
-    discord_id: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
-    osu_user_id: Mapped[str] = mapped_column(String, nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # BigInteger: Discord-Snowflakes (~9e17) sprengen int32 auf PostgreSQL;
+    # auf SQLite macht es keinen Unterschied
+    discord_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True, nullable=False)
+    osu_user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     osu_username: Mapped[str] = mapped_column(String, nullable=False)
     registered_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -26,11 +24,11 @@ class User(Base):
 
 class Play(Base):
     __tablename__ = "plays"
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     timestamp: Mapped[datetime] = mapped_column(DateTime, index=True, nullable=False)
 
-    beatmap_id: Mapped[str] = mapped_column(String, nullable=False)
+    beatmap_id: Mapped[int] = mapped_column(Integer, nullable=False)
     map_length_seconds: Mapped[float] = mapped_column(Float, nullable=False)
     star_rating: Mapped[float] = mapped_column(Float, nullable=False)
     miss_count: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -47,12 +45,15 @@ class Play(Base):
         UniqueConstraint("user_id", "beatmap_id", "timestamp", name="uq_user_map_time"),
         Index("ix_user_timestamp", "user_id", "timestamp"),
         Index("ix_user_pp_desc", "user_id", "pp"),
+        # covering index: cumulative_push(_all) aggregates push_value per user
+        # (optionally time-scoped) as an index-only scan, no row fetches
+        Index("ix_user_time_push", "user_id", "timestamp", "push_value"),
     )
 
 class TopStats(Base):
     __tablename__ = "topstats"
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     month: Mapped[str] = mapped_column(String, nullable=False, index=True)  # YYYY-MM
 
     top10_avg_star_raw: Mapped[float] = mapped_column(Float, nullable=False)
@@ -66,9 +67,33 @@ class TopStats(Base):
         UniqueConstraint("user_id", "month", name="uq_user_month"),
     )
 
+class KVStore(Base):
+    """Kleine Key-Value-Ablage, z.B. fürs OAuth-Token über Neustarts hinweg."""
+    __tablename__ = "kv_store"
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[dict] = mapped_column(SQLITE_JSON, nullable=False)
+
+class Beatmap(Base):
+    """Persistenter Cache für /beatmaps-Lookups — überlebt Neustarts."""
+    __tablename__ = "beatmaps"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # osu! beatmap id
+    beatmapset_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    difficulty_rating: Mapped[float | None] = mapped_column(Float, nullable=True)
+    data: Mapped[dict] = mapped_column(SQLITE_JSON, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+class BeatmapAttr(Base):
+    """Star-Rating pro (Beatmap, Mod-Kombi, Ruleset) aus /beatmaps/{id}/attributes."""
+    __tablename__ = "beatmap_attrs"
+    beatmap_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    mods_key: Mapped[str] = mapped_column(String, primary_key=True)  # "DT,HR" (sortiert)
+    ruleset: Mapped[str] = mapped_column(String, primary_key=True)
+    star_rating: Mapped[float] = mapped_column(Float, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
 class LeaderBoardSnapshot(Base):
     __tablename__ = "leaderboard_snapshots"
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     generated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     scope_hours: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
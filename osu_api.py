@@ -1,15 +1,67 @@
 from __future__ import annotations
 import asyncio
+import logging
+import time
+from collections import defaultdict
 from osu_http import OsuHttpClient
 
+log = logging.getLogger(__name__)
+
+# User lookups barely change; keep results for a while and share
+# in-flight requests so the same name never resolves twice at once.
+USER_CACHE_TTL = 600.0
+# Beatmap-Metadaten und Star-Ratings pro Mod-Kombi sind praktisch statisch;
+# ein Tag TTL reicht, um wiederholte Läufe fast komplett aus dem Cache zu bedienen.
+BEATMAP_CACHE_TTL = 86400.0
+# Mods ohne Einfluss aufs Star-Rating — für die lohnt kein /attributes-POST,
+# das Ranked-SR der Map stimmt bereits (vorher wurde nur nomod/HD übersprungen).
+SR_NEUTRAL_MODS = frozenset({"HD", "NF", "SD", "PF", "CL", "SO", "TD", "AT", "CN", "RX", "AP"})
+
 
 class OsuApi:
-    def __init__(self, http_client: OsuHttpClient):
+    def __init__(self, http_client: OsuHttpClient, storage=None):
         self.http = http_client
+        # optionaler persistenter Cache (Storage); Lookups überleben Neustarts
+        self.storage = storage
+        self._user_cache: dict[str, tuple[float, dict | None]] = {}
+        self._user_inflight: dict[str, asyncio.Future] = {}
+        # share identical in-flight SR lookups and cap the fan-out
+        self._sr_inflight: dict[tuple, asyncio.Future] = {}
+        self._sr_semaphore = asyncio.Semaphore(8)
+        self._beatmap_cache: dict[int, tuple[float, dict | None]] = {}
+        self._sr_cache: dict[tuple, tuple[float, dict | None]] = {}
 
     async def get_user(self, identifier: str) -> dict | None:
         # username oder id
-        return await self.http.get(f"/users/{identifier}/osu")
+        key = str(identifier).lower()
+        hit = self._user_cache.get(key)
+        if hit and hit[0] > time.time():
+            return hit[1]
+
+        inflight = self._user_inflight.get(key)
+        if inflight is not None:
+            return await inflight
+
+        fut = asyncio.get_running_loop().create_future()
+        self._user_inflight[key] = fut
+        try:
+            data = await self.http.get(f"/users/{identifier}/osu")
+            # None heißt "Request gescheitert" (HTTP-Layer unterscheidet kein
+            # 404) — nicht cachen, der nächste Aufruf soll es neu versuchen
+            if data is not None:
+                self._user_cache[key] = (time.time() + USER_CACHE_TTL, data)
+            fut.set_result(data)
+            return data
+        except BaseException as exc:
+            # Future auch im Fehlerfall auflösen, sonst hängen alle Wartenden
+            if isinstance(exc, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(exc)
+                fut.exception()  # kein "never retrieved"-Log, falls niemand wartet
+            raise
+        finally:
+            self._user_inflight.pop(key, None)
 
     async def get_user_best(
         self, user_id: int | str, limit: int = 50, mode: str = "osu"
@@ -18,57 +70,83 @@ class OsuApi:
         Fetches up to 50 best scores. Only calculates star ratings for top 10.
         Returns a dict with top10 plays (with SR), and pp threshold for play 50.
         """
-        print(f"[DEBUG] get_user_best: user_id={user_id}, limit={limit}, mode={mode}")
-        params = {"limit": min(50, limit), "mode": mode}
-        print(f"[DEBUG] get_user_best: Requesting best scores: params={params}")
-        data = await self.http.get(f"/users/{user_id}/scores/best", params=params)
-        print(f"[DEBUG] get_user_best: Received data...")
-        print(f"[DEBUG] get_user_best: Calculating SR...")
+        log.debug("get_user_best: user_id=%s limit=%s mode=%s", user_id, limit, mode)
+        # API liefert max. 50 pro Seite; alle Seiten parallel statt nacheinander
+        pages = await asyncio.gather(
+            *(
+                self.http.get(
+                    f"/users/{user_id}/scores/best",
+                    params={"limit": min(50, limit - o), "offset": o, "mode": mode},
+                )
+                for o in range(0, limit, 50)
+            )
+        )
+        data = [score for page in pages if page for score in page][:limit]
+        log.debug("get_user_best: received %d scores", len(data))
+        log.debug("get_user_best: calculating SR")
 
         if not data:
-            print("[DEBUG] get_user_best: No data received.")
+            log.debug("get_user_best: no data received")
             return {"top10": [], "pp_threshold": 0.0}
 
         # Only calculate SR for top 10
         top10 = data[:10]
         top10_with_sr = await self.apply_actual_sr_to_plays(top10, mode=mode)
-        print(f"[DEBUG] get_user_best: Star ratings applied!")
+        log.debug("get_user_best: star ratings applied")
 
         # Get pp threshold for play 50 (if available)
         pp_threshold = float(data[49]["pp"]) if len(data) >= 50 else 0.0
 
-        # Return both top10 (with SR) and pp threshold
+        # Return both top10 (with SR) and pp threshold; the full list is not
+        # returned — no caller used it, and dropping it frees the ~50 dicts
         return {
             "top10": top10_with_sr,
             "pp_threshold": pp_threshold,
-            "all": data,  # Optional: all plays, with top10 having SR
         }
 
     async def get_user_recent(
         self, user_id: int | str, limit: int = 50, mode: str = "osu"
     ) -> list[dict]:
-        print(f"[DEBUG] user_recent: user_id={user_id}, limit={limit}, mode={mode}")
+        log.debug("user_recent: user_id=%s limit=%s mode=%s", user_id, limit, mode)
         params = {"limit": min(50, limit), "mode": mode}
-        print(f"[DEBUG] user_recent: Requesting recent scores: params={params}")
+        log.debug("user_recent: requesting recent scores: params=%s", params)
         data = await self.http.get(f"/users/{user_id}/scores/recent", params=params)
-        print(f"[DEBUG] user_recent: Received data...")
-        print(f"[DEBUG] user_recent: Calculating SR...")
-        new_data = await OsuApi.apply_actual_sr_to_plays(self, data, mode="osu")
-        print(f"[DEBUG] user_recent: Star ratings applied!")
+        log.debug("user_recent: received data")
+        if not data:
+            return []
+        log.debug("user_recent: calculating SR")
+        new_data = await self.apply_actual_sr_to_plays(data, mode=mode)
+        log.debug("user_recent: star ratings applied")
         return new_data or []
 
     async def get_beatmap(self, beatmap_id: int | str) -> dict | None:
-        return await self.http.get(f"/beatmaps/{beatmap_id}")
+        key = int(beatmap_id)
+        hit = self._beatmap_cache.get(key)
+        if hit and hit[0] > time.time():
+            return hit[1]
+        if self.storage is not None:
+            stored = await asyncio.to_thread(self.storage.get_beatmap, key)
+            if stored is not None:
+                self._beatmap_cache[key] = (time.time() + BEATMAP_CACHE_TTL, stored)
+                return stored
+        data = await self.http.get(f"/beatmaps/{beatmap_id}")
+        if data is not None:
+            self._beatmap_cache[key] = (time.time() + BEATMAP_CACHE_TTL, data)
+        if data and self.storage is not None:
+            await asyncio.to_thread(self.storage.upsert_beatmap, key, data)
+        return data
 
     async def apply_actual_sr_to_plays(
         self, plays: list[dict], mode: str = "osu"
     ) -> list[dict]:
         """
-        Iterates over plays and updates each play's beatmap with the real star rating
-        based on the mods applied, using asyncio.gather for concurrency.
+        Updates each play's beatmap with the real star rating based on the mods
+        applied. Plays are grouped by (beatmap_id, mods, mode) first, so each
+        unique combination costs at most one request; the result is fanned back
+        out to every play in the group.
         """
-
-        async def fetch_sr(play):
+        buckets: dict[tuple, list[dict]] = defaultdict(list)
+        for play in plays:
             mods = []
             mod_settings = {}
 
@@ -83,27 +161,78 @@ class OsuApi:
 
             # TODO: if we have any settings associated with a mod, we need to do the sr calc here instead of sending away
 
-            if len(mods) == 0 or (len(mods) == 1 and mods[0] == "HD"):
-                return play
-
-            beatmap_id = play["beatmap"]["id"]
-            body = {"mods": mods, "ruleset": mode}
-            sr_data = await self.http.post(
-                f"/beatmaps/{beatmap_id}/attributes", body=body
-            )
-
+            if not mods or set(mods).issubset(SR_NEUTRAL_MODS):
+                continue
+
+            buckets[(play["beatmap"]["id"], tuple(sorted(mods)), mode)].append(play)
+
+        async def fetch_sr(key: tuple) -> tuple[tuple, dict | None]:
+            beatmap_id, mods, mode_ = key
+            cached = self._sr_cache.get(key)
+            if cached and cached[0] > time.time():
+                return key, cached[1]
+
+            if self.storage is not None:
+                mods_key = ",".join(mods)
+                stored_sr = await asyncio.to_thread(
+                    self.storage.get_beatmap_attr, beatmap_id, mods_key, mode_
+                )
+                if stored_sr is not None:
+                    sr_data = {"attributes": {"star_rating": stored_sr}}
+                    self._sr_cache[key] = (time.time() + BEATMAP_CACHE_TTL, sr_data)
+                    return key, sr_data
+
+            inflight = self._sr_inflight.get(key)
+            if inflight is not None:
+                # identical lookup already running -> share its result
+                return key, await inflight
+
+            fut = asyncio.get_running_loop().create_future()
+            self._sr_inflight[key] = fut
+            try:
+                async with self._sr_semaphore:
+                    sr_data = await self.http.post(
+                        f"/beatmaps/{beatmap_id}/attributes",
+                        body={"mods": list(mods), "ruleset": mode_},
+                    )
+                if sr_data is not None:
+                    self._sr_cache[key] = (time.time() + BEATMAP_CACHE_TTL, sr_data)
+                if (
+                    self.storage is not None
+                    and sr_data
+                    and "attributes" in sr_data
+                    and "star_rating" in sr_data["attributes"]
+                ):
+                    await asyncio.to_thread(
+                        self.storage.upsert_beatmap_attr,
+                        beatmap_id,
+                        ",".join(mods),
+                        mode_,
+                        float(sr_data["attributes"]["star_rating"]),
+                    )
+                fut.set_result(sr_data)
+                return key, sr_data
+            except BaseException as exc:
+                if isinstance(exc, asyncio.CancelledError):
+                    fut.cancel()
+                else:
+                    fut.set_exception(exc)
+                    fut.exception()
+                raise
+            finally:
+                self._sr_inflight.pop(key, None)
+
+        # one lookup per unique (beatmap, mods, mode), then fan out
+        for key, sr_data in await asyncio.gather(*(fetch_sr(k) for k in buckets)):
             if (
                 sr_data
                 and "attributes" in sr_data
                 and "star_rating" in sr_data["attributes"]
             ):
-                play["beatmap"]["difficulty_rating"] = sr_data["attributes"][
-                    "star_rating"
-                ]
+                sr = sr_data["attributes"]["star_rating"]
             else:
-                play["beatmap"]["difficulty_rating"] = None
-
-            return play
+                sr = None
+            for play in buckets[key]:
+                play["beatmap"]["difficulty_rating"] = sr
 
-        # Run all fetch_sr coroutines concurrently
-        return await asyncio.gather(*(fetch_sr(play) for play in plays))
+        return plays
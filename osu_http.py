@@ -1,150 +1,201 @@
 import asyncio
 import time
-from typing import Any, Callable, Awaitable
+from typing import Any
 import httpx
+import orjson
 
 OSU_BASE = "https://osu.ppy.sh/api/v2"
 OSU_OAUTH_URL = "https://osu.ppy.sh/oauth/token"
 
+# osu! allows ~60 req/min with bursts; a token bucket lets concurrent
+# requests overlap instead of the old strict one-request-per-second queue.
+RATE_PER_SECOND = 60.0 / 60.0
+BURST = 20.0
+MAX_IN_FLIGHT = 10
+
+
+def _freeze(value):
+    """Hashable key part for params/body dicts (handles nested lists)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 
 class OsuHttpClient:
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(self, client_id: str, client_secret: str, storage=None):
         self.client_id = client_id
         self.client_secret = client_secret
+        self.storage = storage
         self._token: str | None = None
         self._token_exp: float = 0.0
-        self._client = httpx.AsyncClient(timeout=20)
-        self._queue: asyncio.Queue[Callable[[], Awaitable[Any]]] = asyncio.Queue()
-        self._worker_task: asyncio.Task | None = None
-
-    async def _ensure_worker(self):
-        if self._worker_task is None or self._worker_task.done():
-            loop = asyncio.get_running_loop()
-            self._worker_task = loop.create_task(self._queue_worker())
+        # auth headers rebuilt once per token refresh, not per request
+        self._headers: dict[str, str] = {}
+        if storage is not None:
+            # Token überlebt Neustarts: gültiges Paar aus der DB übernehmen,
+            # dann entfällt der OAuth-Roundtrip vor dem ersten Request
+            saved = storage.get_oauth_token()
+            if saved and saved[1] > time.time() + 60:
+                self._apply_token(saved[0], saved[1])
+        # keep connections to osu.ppy.sh alive so bursts skip the TLS
+        # handshake; HTTP/2 multiplexes concurrent requests on one connection
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(20.0),
+            limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=20, keepalive_expiry=300
+            ),
+            http2=True,
+            # br vor gzip: große Score-Payloads schrumpfen deutlich stärker
+            # (brotli-Paket muss installiert sein, sonst bliebe nur gzip)
+            headers={"Accept-Encoding": "br, gzip"},
+        )
+        self._sem = asyncio.Semaphore(MAX_IN_FLIGHT)
+        # identical requests issued while one is running share its result
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._bucket_tokens = BURST
+        self._bucket_last = time.time()
+        self._refresh_task: asyncio.Task | None = None
 
     async def aclose(self):
         try:
-            if self._worker_task:
-                self._worker_task.cancel()
+            if self._refresh_task:
+                self._refresh_task.cancel()
                 try:
-                    await self._worker_task
+                    await self._refresh_task
                 except asyncio.CancelledError:
                     pass
         finally:
             await self._client.aclose()
 
-    async def _queue_worker(self):
-        last_call = 0.0
+    def _apply_token(self, token: str, exp: float):
+        self._token = token
+        self._token_exp = exp
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "x-api-version": "20240705",
+        }
+
+    async def _acquire_rate_token(self):
         while True:
-            job = await self._queue.get()
-            wait = 1.0 - (time.time() - last_call)
+            now = time.time()
+            self._bucket_tokens = min(
+                BURST, self._bucket_tokens + (now - self._bucket_last) * RATE_PER_SECOND
+            )
+            self._bucket_last = now
+            if self._bucket_tokens >= 1.0:
+                self._bucket_tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._bucket_tokens) / RATE_PER_SECOND)
+
+    async def _refresh_token(self):
+        # über den gepoolten Client statt einer Wegwerf-Session: spart den
+        # TCP/TLS-Aufbau pro Refresh und hält alles auf einer Verbindung
+        resp = await self._client.post(
+            OSU_OAUTH_URL,
+            json={
+                "grant_type": "client_credentials",
+                "client_id": int(self.client_id),
+                "client_secret": self.client_secret,
+                "scope": "public",
+            },
+        )
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        self._apply_token(data["access_token"], time.time() + int(data["expires_in"]))
+        if self.storage is not None:
+            await asyncio.to_thread(
+                self.storage.set_oauth_token, self._token, self._token_exp
+            )
+
+    async def _refresh_loop(self):
+        # refresh well before expiry so no request ever pays the OAuth RTT
+        while True:
+            wait = self._token_exp - 300 - time.time()
             if wait > 0:
                 await asyncio.sleep(wait)
             try:
-                await job()
-            finally:
-                last_call = time.time()
-                self._queue.task_done()
+                await self._refresh_token()
+            except httpx.HTTPError:
+                await asyncio.sleep(60)
 
     async def _ensure_token(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            loop = asyncio.get_running_loop()
+            self._refresh_task = loop.create_task(self._refresh_loop())
         if self._token and time.time() < self._token_exp - 30:
             return
-        async with httpx.AsyncClient(timeout=20) as c:
-            resp = await c.post(
-                OSU_OAUTH_URL,
-                json={
-                    "grant_type": "client_credentials",
-                    "client_id": int(self.client_id),
-                    "client_secret": self.client_secret,
-                    "scope": "public",
-                },
-            )
-        resp.raise_for_status()
-        data = resp.json()
-        self._token = data["access_token"]
-        self._token_exp = time.time() + int(data["expires_in"])
-
-    async def get(self, path: str, params: dict | None = None) -> Any:
-        await self._ensure_worker()
+        await self._refresh_token()
+
+    async def _request_with_retry(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        body: dict | None = None,
+    ) -> Any:
         await self._ensure_token()
-        headers = {
-            "Authorization": f"Bearer {self._token}",
-            "x-api-version": "20240705",
-        }
-        result_holder = {}
-
-        async def do_request():
-            try:
-                r = await self._client.get(
-                    f"{OSU_BASE}{path}", params=params, headers=headers
-                )
-                r.raise_for_status()
-                result_holder["data"] = r.json()
-            except httpx.HTTPError:
-                for t in (0.5, 1.0, 2.0):
-                    await asyncio.sleep(t)
-                    try:
-                        r2 = await self._client.get(
-                            f"{OSU_BASE}{path}", params=params, headers=headers
-                        )
-                        r2.raise_for_status()
-                        result_holder["data"] = r2.json()
-                        return
-                    except httpx.HTTPError:
-                        continue
-                result_holder["data"] = None
+        async with self._sem:
+            await self._acquire_rate_token()
+            # erster Versuch sofort, danach 0.5/1/2s Backoff
+            for delay in (0.0, 0.5, 1.0, 2.0):
+                if delay:
+                    await asyncio.sleep(delay)
+                try:
+                    r = await self._client.request(
+                        method,
+                        f"{OSU_BASE}{path}",
+                        params=params,
+                        json=body,
+                        headers=self._headers,
+                    )
+                    r.raise_for_status()
+                    return orjson.loads(r.content)
+                except httpx.HTTPError:
+                    continue
+            return None
 
+    async def get(self, path: str, params: dict | None = None) -> Any:
+        key = ("GET", path, _freeze(params))
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await inflight
         fut = asyncio.get_running_loop().create_future()
-
-        async def jobwrap():
-            await do_request()
-            fut.set_result(True)
-
-        await self._queue.put(jobwrap)
-        await fut
-        return result_holder.get("data")
+        self._inflight[key] = fut
+        try:
+            data = await self._request_with_retry("GET", path, params=params)
+            fut.set_result(data)
+            return data
+        except BaseException as exc:
+            # Future auch im Fehlerfall auflösen, sonst hängen alle Wartenden
+            if isinstance(exc, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(exc)
+                fut.exception()  # kein "never retrieved"-Log, falls niemand wartet
+            raise
+        finally:
+            self._inflight.pop(key, None)
 
     async def post(
         self, path: str, params: dict | None = None, body: dict | None = None
     ) -> Any:
-        await self._ensure_worker()
-        await self._ensure_token()
-        headers = {
-            "Authorization": f"Bearer {self._token}",
-            "x-api-version": "20240705",
-        }
-        result_holder = {}
-
-        async def do_request():
-            try:
-                r = await self._client.post(
-                    f"{OSU_BASE}{path}", params=params, json=body, headers=headers
-                )
-                r.raise_for_status()
-                result_holder["data"] = r.json()
-            except httpx.HTTPError:
-                for t in (0.5, 1.0, 2.0):
-                    await asyncio.sleep(t)
-                    try:
-                        r2 = await self._client.post(
-                            f"{OSU_BASE}{path}",
-                            params=params,
-                            json=body,
-                            headers=headers,
-                        )
-                        r2.raise_for_status()
-                        result_holder["data"] = r2.json()
-                        return
-                    except httpx.HTTPError:
-                        continue
-                result_holder["data"] = None
-
+        key = ("POST", path, _freeze(params), _freeze(body))
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await inflight
         fut = asyncio.get_running_loop().create_future()
-
-        async def jobwrap():
-            await do_request()
-            fut.set_result(True)
-
-        await self._queue.put(jobwrap)
-        await fut
-        return result_holder.get("data")
+        self._inflight[key] = fut
+        try:
+            data = await self._request_with_retry("POST", path, params=params, body=body)
+            fut.set_result(data)
+            return data
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(exc)
+                fut.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
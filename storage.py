@@ -1,16 +1,36 @@
 from __future__ import annotations
 import contextlib
+import time
 from datetime import timedelta
-from sqlalchemy import create_engine, func, select, desc, and_
+import numpy as np
+from sqlalchemy import create_engine, event, func, select, desc, and_
 from sqlalchemy.orm import sessionmaker
-from models import Base, User, Play, TopStats, LeaderBoardSnapshot
+from models import Base, User, Play, TopStats, LeaderBoardSnapshot, Beatmap, BeatmapAttr, KVStore
 from utils import utcnow_naive
 
 class Storage:
     def __init__(self, db_url: str):
         self.engine = create_engine(db_url, future=True)
+        if self.engine.dialect.name == "sqlite":
+            # WAL + NORMAL sync: Commits kosten keinen vollen fsync mehr,
+            # Leser blockieren Schreiber nicht. Gilt für jede Connection im Pool.
+            @event.listens_for(self.engine, "connect")
+            def _set_sqlite_pragmas(dbapi_con, _record):
+                cur = dbapi_con.cursor()
+                cur.execute("PRAGMA journal_mode=WAL")
+                cur.execute("PRAGMA synchronous=NORMAL")
+                cur.execute("PRAGMA temp_store=MEMORY")
+                cur.execute("PRAGMA cache_size=-64000")
+                cur.execute("PRAGMA mmap_size=268435456")
+                cur.close()
+
         Base.metadata.create_all(self.engine)
         self.Session = sessionmaker(self.engine, expire_on_commit=False, future=True)
+        # users-Tabelle ändert sich nur bei &register -> Version + TTL-Cache
+        self._users_version = 0
+        self._users_cache: list[User] | None = None
+        self._users_cache_version = -1
+        self._users_cache_at = 0.0
 
     @contextlib.contextmanager
     def session(self):
@@ -25,7 +45,7 @@ class Storage:
             s.close()
 
     # Users
-    def upsert_user(self, discord_id: str, osu_user_id: str, osu_username: str) -> User:
+    def upsert_user(self, discord_id: int, osu_user_id: int, osu_username: str) -> User:
         with self.session() as s:
             u = s.scalar(select(User).where(User.discord_id == discord_id))
             if u:
@@ -34,36 +54,106 @@ class Storage:
             else:
                 u = User(discord_id=discord_id, osu_user_id=osu_user_id, osu_username=osu_username)
                 s.add(u)
+            self._users_version += 1
             return u
 
-    def get_user_by_discord(self, discord_id: str) -> User | None:
+    def get_user_by_discord(self, discord_id: int) -> User | None:
         with self.session() as s:
             return s.scalar(select(User).where(User.discord_id == discord_id))
 
+    def get_user_by_osu_id(self, osu_user_id: int | str) -> User | None:
+        with self.session() as s:
+            return s.scalar(select(User).where(User.osu_user_id == int(osu_user_id)))
+
     def get_user_by_osu_username(self, username: str) -> User | None:
         with self.session() as s:
             return s.scalar(select(User).where(func.lower(User.osu_username) == username.lower()))
 
     def get_all_users(self) -> list[User]:
+        if (
+            self._users_cache is not None
+            and self._users_cache_version == self._users_version
+            and time.time() - self._users_cache_at < 300.0  # TTL als Sicherheitsnetz
+        ):
+            return self._users_cache
         with self.session() as s:
-            return list(s.scalars(select(User)))
+            users = list(s.scalars(select(User)))
+        self._users_cache = users
+        self._users_cache_version = self._users_version
+        self._users_cache_at = time.time()
+        return users
 
     # Plays
     def insert_play_if_new(self, p: Play) -> bool:
+        """Einzelfall-Variante; für ganze Listen insert_plays_bulk nehmen."""
         with self.session() as s:
-            exists = s.scalar(
-                select(Play.id).where(
+            # SELECT 1 ... LIMIT 1: reiner Existenz-Check über den
+            # Unique-Index, ohne eine Zeile zu materialisieren
+            exists = s.execute(
+                select(1)
+                .where(
                     (Play.user_id == p.user_id)
                     & (Play.beatmap_id == p.beatmap_id)
                     & (Play.timestamp == p.timestamp)
                 )
-            )
+                .limit(1)
+            ).first()
             if exists:
                 return False
             s.add(p)
             return True
 
-    def recent_plays_for_user(self, user_id: str, hours: int | None = None) -> list[Play]:
+    def insert_plays_bulk(self, plays: list[Play]) -> int:
+        """Alle Plays in einem INSERT ... ON CONFLICT DO NOTHING, eine Transaktion.
+
+        Liefert die Anzahl tatsächlich eingefügter Zeilen (Duplikate zählen nicht).
+        """
+        if not plays:
+            return 0
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        rows = [
+            {
+                "user_id": p.user_id,
+                "timestamp": p.timestamp,
+                "beatmap_id": p.beatmap_id,
+                "map_length_seconds": p.map_length_seconds,
+                "star_rating": p.star_rating,
+                "miss_count": p.miss_count,
+                "accuracy_percent": p.accuracy_percent,
+                "pp": p.pp,
+                "failed": p.failed,
+                "push_value": p.push_value,
+                "source": p.source,
+            }
+            for p in plays
+        ]
+        # Core-Insert über die Table, nicht die ORM-Klasse: mit der Klasse
+        # läuft executemany durch den ORM-Bulk-Pfad, dessen Result kein
+        # rowcount hat (AttributeError unter SQLAlchemy 2.0)
+        stmt = dialect_insert(Play.__table__).on_conflict_do_nothing(
+            index_elements=["user_id", "beatmap_id", "timestamp"]
+        )
+        inserted = 0
+        with self.session() as s:
+            # Flush in Blöcken, damit auch große Backfills in einer
+            # Transaktion bleiben, ohne riesige Statements zu bauen.
+            for i in range(0, len(rows), 500):
+                result = s.execute(stmt, rows[i : i + 500])
+                inserted += int(result.rowcount or 0)
+        return inserted
+
+    def existing_play_keys(self, user_id: int, since=None) -> set[tuple[int, object]]:
+        """(beatmap_id, timestamp)-Schlüssel der schon gespeicherten Plays."""
+        with self.session() as s:
+            q = select(Play.beatmap_id, Play.timestamp).where(Play.user_id == user_id)
+            if since is not None:
+                q = q.where(Play.timestamp >= since)
+            return {(beatmap_id, ts) for beatmap_id, ts in s.execute(q)}
+
+    def recent_plays_for_user(self, user_id: int, hours: int | None = None) -> list[Play]:
         with self.session() as s:
             q = select(Play).where(Play.user_id == user_id)
             if hours is not None:
@@ -71,7 +161,7 @@ class Storage:
                 q = q.where(Play.timestamp >= since)
             return list(s.scalars(q.order_by(Play.timestamp.desc())))
 
-    def plays_in_month(self, user_id: str, year: int, month: int) -> list[Play]:
+    def plays_in_month(self, user_id: int, year: int, month: int) -> list[Play]:
         from datetime import datetime as dt
         start = dt(year, month, 1)
         # nächster Monat:
@@ -80,7 +170,20 @@ class Storage:
             q = select(Play).where((Play.user_id == user_id) & (Play.timestamp >= start) & (Play.timestamp < end))
             return list(s.scalars(q))
 
-    def cumulative_push(self, user_id: str, scope_hours: int | None = None) -> float:
+    def star_ratings_in_month(self, user_id: int, year: int, month: int) -> np.ndarray:
+        """Nur die star_rating-Spalte als Array — keine ORM-Objekte für das Histogramm."""
+        from datetime import datetime as dt
+        start = dt(year, month, 1)
+        end = dt(year + (1 if month == 12 else 0), 1 if month == 12 else month + 1, 1)
+        with self.session() as s:
+            rows = s.scalars(
+                select(Play.star_rating).where(
+                    (Play.user_id == user_id) & (Play.timestamp >= start) & (Play.timestamp < end)
+                )
+            )
+            return np.fromiter(rows, dtype=np.float32)
+
+    def cumulative_push(self, user_id: int, scope_hours: int | None = None) -> float:
         from sqlalchemy import select
         with self.session() as s:
             q = select(func.sum(Play.push_value)).where((Play.user_id == user_id) & (Play.push_value != None))
@@ -90,8 +193,85 @@ class Storage:
             val = s.scalar(q)
             return float(val or 0.0)
 
+    def cumulative_push_all(self, scope_hours: int | None = None) -> dict[int, float]:
+        """Summierte Push-Values für alle User in einer Query (GROUP BY user_id)."""
+        with self.session() as s:
+            q = select(Play.user_id, func.sum(Play.push_value)).where(Play.push_value != None)
+            if scope_hours is not None:
+                since = utcnow_naive() - timedelta(hours=scope_hours)
+                q = q.where(Play.timestamp >= since)
+            q = q.group_by(Play.user_id)
+            return {user_id: float(total or 0.0) for user_id, total in s.execute(q)}
+
+    # KVStore
+    def get_oauth_token(self) -> tuple[str, float] | None:
+        """Gespeichertes (token, exp)-Paar oder None — spart den Refresh beim Boot."""
+        with self.session() as s:
+            row = s.get(KVStore, "osu_oauth_token")
+            if not row:
+                return None
+            return row.value["token"], float(row.value["exp"])
+
+    def set_oauth_token(self, token: str, exp: float) -> None:
+        with self.session() as s:
+            row = s.get(KVStore, "osu_oauth_token")
+            value = {"token": token, "exp": exp}
+            if row:
+                row.value = value
+            else:
+                s.add(KVStore(key="osu_oauth_token", value=value))
+
+    # Beatmaps (persistenter Lookup-Cache, vgl. In-Process-TTL in OsuApi)
+    def get_beatmap(self, beatmap_id: int) -> dict | None:
+        with self.session() as s:
+            b = s.get(Beatmap, int(beatmap_id))
+            return b.data if b else None
+
+    def upsert_beatmap(self, beatmap_id: int, data: dict) -> None:
+        with self.session() as s:
+            b = s.get(Beatmap, int(beatmap_id))
+            if b:
+                b.data = data
+                b.beatmapset_id = data.get("beatmapset_id")
+                b.difficulty_rating = data.get("difficulty_rating")
+                b.fetched_at = utcnow_naive()
+            else:
+                s.add(
+                    Beatmap(
+                        id=int(beatmap_id),
+                        beatmapset_id=data.get("beatmapset_id"),
+                        difficulty_rating=data.get("difficulty_rating"),
+                        data=data,
+                        fetched_at=utcnow_naive(),
+                    )
+                )
+
+    def get_beatmap_attr(self, beatmap_id: int, mods_key: str, ruleset: str) -> float | None:
+        with self.session() as s:
+            attr = s.get(BeatmapAttr, (int(beatmap_id), mods_key, ruleset))
+            return attr.star_rating if attr else None
+
+    def upsert_beatmap_attr(
+        self, beatmap_id: int, mods_key: str, ruleset: str, star_rating: float
+    ) -> None:
+        with self.session() as s:
+            attr = s.get(BeatmapAttr, (int(beatmap_id), mods_key, ruleset))
+            if attr:
+                attr.star_rating = star_rating
+                attr.fetched_at = utcnow_naive()
+            else:
+                s.add(
+                    BeatmapAttr(
+                        beatmap_id=int(beatmap_id),
+                        mods_key=mods_key,
+                        ruleset=ruleset,
+                        star_rating=star_rating,
+                        fetched_at=utcnow_naive(),
+                    )
+                )
+
     # TopStats
-    def get_topstats(self, user_id: str, month_str: str) -> TopStats | None:
+    def get_topstats(self, user_id: int, month_str: str) -> TopStats | None:
         with self.session() as s:
             return s.scalar(select(TopStats).where((TopStats.user_id == user_id) & (TopStats.month == month_str)))
 
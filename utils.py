@@ -1,10 +1,11 @@
 from __future__ import annotations
-from datetime import datetime, timezone
+import time
+from datetime import datetime
 
 def current_month_str_utc() -> str:
-    """YYYY-MM in UTC (aware, aber Rückgabe ist String)."""
-    now = datetime.now(timezone.utc)
-    return f"{now.year:04d}-{now.month:02d}"
+    """YYYY-MM in UTC — über time.gmtime(), ohne datetime-Allokation."""
+    t = time.gmtime()
+    return "%04d-%02d" % (t.tm_year, t.tm_mon)
 
 def ymd(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
@@ -16,5 +17,9 @@ def safe_float(x, default=0.0) -> float:
         return default
 
 def utcnow_naive() -> datetime:
-    """UTC jetzt als naive datetime (tzinfo=None), damit alle DB-Zeitstempel konsistent sind."""
-    return datetime.now(timezone.utc).replace(tzinfo=None)
+    """UTC jetzt als naive datetime (tzinfo=None), damit alle DB-Zeitstempel konsistent sind.
+
+    datetime.utcnow() statt now(timezone.utc).replace(...): gleiches Ergebnis,
+    aber ohne den Umweg über ein aware-Objekt — wird in den DB-Pfaden oft gerufen.
+    """
+    return datetime.utcnow()